@@ -2,7 +2,6 @@ import backtrader as bt
 import pandas as pd
 import logging
 from strategies.strategy import TradingStrategy
-from bot import obter_dados_historicos
 
 # Configurar logging para exibir informações do backtest
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -88,6 +87,9 @@ def rodar_backtest(strategy_class):
     """
     Executa o backtest usando os dados históricos da Binance e a estratégia implementada.
     """
+    # Importado aqui para que importar este módulo não conecte à Binance
+    from bot import obter_dados_historicos
+
     logging.info("\n🚀 Iniciando Backtest...")
 
     # Agora passamos a criptomoeda manualmente para evitar erro
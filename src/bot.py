@@ -1,4 +1,4 @@
-from strategies.strategy import TradingStrategy
+from strategies.strategy import TradingStrategy, STOP_LOSS, TAKE_PROFIT
 import pandas as pd
 from binance.client import Client
 from dotenv import load_dotenv
@@ -34,9 +34,7 @@ POSICAO_ABERTA = None  # Pode ser 'long', 'short' ou None
 PRECO_ENTRADA = None  # Preço de entrada da posição aberta
 contador_operacoes = 0  # Contador de operações realizadas no dia
 
-# Parâmetros de gerenciamento de riscos
-STOP_LOSS = 0.05  # 5% de perda máxima permitida
-TAKE_PROFIT = 0.05  # 5% de lucro desejado
+# Parâmetros de gerenciamento de riscos (STOP_LOSS e TAKE_PROFIT vêm de strategies.strategy)
 LIMITE_OPERACOES = 10  # Limite de operações por dia
 
 def obter_saldo():
@@ -59,10 +57,11 @@ def obter_saldo():
     except Exception as e:
         logging.error(f"Erro ao obter saldo da conta: {e}")
 
-def obter_dados_historicos(limite=100, cripto_atual=None):
+def obter_dados_historicos(limite=100, cripto_atual=None, fim=None):
     """
     Obtém dados históricos (candlesticks) e os converte para um DataFrame Pandas.
     Retorna o DataFrame e o preço de fechamento mais recente.
+    :param fim: Timestamp (ms) do último candle desejado; None para os candles mais recentes.
     """
     try:
         if cripto_atual is None:
@@ -70,7 +69,10 @@ def obter_dados_historicos(limite=100, cripto_atual=None):
         if cripto_atual is None:
             raise ValueError("CRIPTO_ATUAL não foi definido! Execute configurar_operacao() primeiro.")
 
-        candles = client.get_klines(symbol=cripto_atual, interval="5m", limit=limite)
+        if fim is None:
+            candles = client.get_klines(symbol=cripto_atual, interval="5m", limit=limite)
+        else:
+            candles = client.get_klines(symbol=cripto_atual, interval="5m", limit=limite, endTime=fim)
 
         # Criar DataFrame com os dados
         df = pd.DataFrame(candles, columns=[
@@ -0,0 +1,417 @@
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from strategies.strategy import TradingStrategy, STOP_LOSS, TAKE_PROFIT
+from backtest import BacktestStrategy, preparar_dados_backtrader, CRIPTO_ATUAL, VALOR_INICIAL
+
+# Configurar logging para exibir informações da análise de robustez
+logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+# Definições globais
+LIMITE_CANDLES = 1000  # Máximo de candles por requisição na Binance
+LIMITE_TOTAL = 10000  # Candles buscados (paginados) para a análise, ~35 dias em 5m
+JANELA_HISTORICO = 100  # Candles entregues à estratégia a cada candle, como em bot.executar_estrategia
+AQUECIMENTO = JANELA_HISTORICO  # Candles iniciais de cada cenário usados só para preencher a janela
+VALOR_OPERACAO = 1000  # Valor (USDT) de cada operação; a quantidade é VALOR_OPERACAO / preço, como em bot.py
+COMISSAO_PADRAO = 0.001  # Mesma taxa de 0.1% usada no backtest simples
+FAIXA_COMISSAO = (0.0005, 0.002)  # Faixa sorteada nos cenários de taxas
+FAIXA_SLIPPAGE = (0.0, 0.001)  # Faixa de slippage (fração do preço) sorteada nos cenários de taxas
+PERCENTIS = [0.05, 0.25, 0.5, 0.75, 0.95]
+COLUNAS = ["tempo", "open", "high", "low", "close", "volume"]
+
+# Candles compartilhados entre os processos (preenchidos por _iniciar_worker)
+_SHM = None
+_CANDLES = None
+
+
+class BacktestHistorico(BacktestStrategy):
+    """
+    Variante do BacktestStrategy que reproduz o ciclo de bot.executar_estrategia: entrega à
+    estratégia os últimos `janela` candles e o preço de entrada, fecha a posição no STOP_LOSS
+    ou TAKE_PROFIT e só abre posição quando não há nenhuma aberta. Só opera após `aquecimento`
+    candles.
+
+    Diferenças em relação ao bot:
+    - Os sinais são avaliados no fechamento de cada candle, e as ordens executam na abertura
+      do candle seguinte (o bot consulta a cada 60s, com o candle atual ainda em formação).
+    - O preço de entrada é o preço executado, e não o fechamento no momento do sinal.
+    - LIMITE_OPERACOES não é aplicado, pois o contador do bot nunca é zerado e travaria
+      qualquer série longa após 10 operações.
+    """
+
+    def __init__(self, strategy_class, aquecimento=AQUECIMENTO, janela=JANELA_HISTORICO):
+        super().__init__(strategy_class)
+        self.aquecimento = aquecimento
+        self.janela = janela
+
+    def notify_order(self, order):
+        """
+        Além de registrar as execuções, libera novas ordens quando a ordem não é executada.
+        """
+        super().notify_order(order)
+        if order.status in [order.Canceled, order.Margin, order.Rejected]:
+            logging.info(f"⚠️ Ordem não executada: {order.getstatusname()}")
+            self.order = None
+
+    def next(self):
+        """
+        A cada novo candle, verifica stop loss e take profit e depois os sinais sobre os últimos
+        `janela` candles, na mesma ordem de prioridade de bot.executar_estrategia.
+        """
+        if self.order or len(self) <= self.aquecimento:
+            return
+
+        dados = self.datas[0]
+
+        if self.position:
+            variacao = (dados.close[0] - self.position.price) / self.position.price
+            if self.position.size < 0:
+                variacao = -variacao
+
+            if variacao <= -STOP_LOSS:
+                self.order = self.close()
+                logging.info(f"🚨 Stop Loss atingido - Preço: {dados.close[0]:.2f}")
+                return
+            if variacao >= TAKE_PROFIT:
+                self.order = self.close()
+                logging.info(f"🎉 Take Profit atingido - Preço: {dados.close[0]:.2f}")
+                return
+
+        n = min(len(self), self.janela)
+        df = pd.DataFrame({
+            'abertura': dados.open.get(size=n),
+            'máxima': dados.high.get(size=n),
+            'mínima': dados.low.get(size=n),
+            'fechamento': dados.close.get(size=n),
+            'volume': dados.volume.get(size=n)
+        })
+
+        preco_entrada = self.position.price if self.position else None
+        trading_strategy = self.strategy_class(df, preco_entrada)
+        quantidade = VALOR_OPERACAO / dados.close[0]
+
+        if not self.position:
+            if trading_strategy.verificar_compra():
+                self.order = self.buy(size=quantidade)
+                logging.info(f"📈 COMPRA enviada - Preço: {dados.close[0]:.2f}")
+            elif trading_strategy.verificar_short():
+                self.order = self.sell(size=quantidade)
+                logging.info(f"🔻 SHORT enviado - Preço: {dados.close[0]:.2f}")
+
+        elif self.position.size > 0 and trading_strategy.verificar_venda():
+            self.order = self.close()
+            logging.info(f"📉 VENDA enviada - Preço: {dados.close[0]:.2f}")
+
+        elif self.position.size < 0 and trading_strategy.verificar_recompra():
+            self.order = self.close()
+            logging.info(f"🔺 RECOMPRA SHORT enviada - Preço: {dados.close[0]:.2f}")
+
+
+def _iniciar_worker(nome_shm, formato):
+    """
+    Conecta o processo à memória compartilhada com os candles, sem copiar os dados.
+    """
+    global _SHM, _CANDLES
+
+    # Os logs de cada ordem do BacktestStrategy poluiriam a saída de centenas de execuções
+    logging.getLogger().setLevel(logging.WARNING)
+
+    _SHM = shared_memory.SharedMemory(name=nome_shm)
+    _CANDLES = np.ndarray(formato, dtype=np.float64, buffer=_SHM.buf)
+
+
+def _candles_para_array(df):
+    """
+    Converte o DataFrame do Backtrader em um array (tempo em segundos, OHLCV) de float64.
+    """
+    candles = np.empty((len(df), len(COLUNAS)), dtype=np.float64)
+    candles[:, 0] = df.index.values.astype("datetime64[s]").astype(np.int64)
+    candles[:, 1:] = df[COLUNAS[1:]].to_numpy(dtype=np.float64)
+    return candles
+
+
+def _reamostrar_blocos(candles, tamanho_bloco, rng):
+    """
+    Gera uma série sintética por block bootstrap dos movimentos relativos de cada candle.
+    Os blocos preservam a autocorrelação de curto prazo e a série é reconstruída a partir
+    do primeiro fechamento, mantendo a grade de tempo original.
+    """
+    abertura, maxima, minima, fechamento, volume = candles[:, 1:].T
+    fechamento_anterior = fechamento[:-1]
+    topo = np.maximum(abertura, fechamento)[1:]
+    fundo = np.minimum(abertura, fechamento)[1:]
+
+    # Movimentos relativos de cada candle em relação ao fechamento anterior
+    gap = abertura[1:] / fechamento_anterior
+    retorno = fechamento[1:] / fechamento_anterior
+    sombra_superior = maxima[1:] / topo
+    sombra_inferior = minima[1:] / fundo
+
+    n = len(retorno)
+    n_blocos = -(-n // tamanho_bloco)
+    inicios = rng.integers(0, n - tamanho_bloco + 1, size=n_blocos)
+    indices = (inicios[:, None] + np.arange(tamanho_bloco)).ravel()[:n]
+
+    novo_fechamento = fechamento[0] * np.cumprod(retorno[indices])
+    nova_abertura = np.concatenate(([fechamento[0]], novo_fechamento[:-1])) * gap[indices]
+
+    sintetico = candles.copy()
+    sintetico[1:, 1] = nova_abertura
+    sintetico[1:, 2] = np.maximum(nova_abertura, novo_fechamento) * sombra_superior[indices]
+    sintetico[1:, 3] = np.minimum(nova_abertura, novo_fechamento) * sombra_inferior[indices]
+    sintetico[1:, 4] = novo_fechamento
+    sintetico[1:, 5] = volume[1:][indices]
+    return sintetico
+
+
+def _rodar_cerebro(candles, strategy_class, comissao, slippage, aquecimento):
+    """
+    Executa um backtest nos candles informados, operando só após `aquecimento` candles.
+    Retorna o PnL, o drawdown máximo (%) e o número de trades.
+    """
+    df = pd.DataFrame(candles[:, 1:], columns=COLUNAS[1:], index=pd.to_datetime(candles[:, 0], unit="s"))
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.addstrategy(BacktestHistorico, strategy_class=strategy_class, aquecimento=aquecimento)
+    cerebro.adddata(bt.feeds.PandasData(dataname=df))
+    cerebro.broker.set_cash(VALOR_INICIAL)
+    cerebro.broker.setcommission(commission=comissao)
+    if slippage:
+        cerebro.broker.set_slippage_perc(slippage)
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name="drawdown")
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name="trades")
+
+    resultado = cerebro.run()[0]
+    pnl = cerebro.broker.getvalue() - VALOR_INICIAL
+    drawdown = resultado.analyzers.drawdown.get_analysis().max.drawdown
+    trades = resultado.analyzers.trades.get_analysis().total.total
+    return pnl, drawdown, trades
+
+
+def _executar_cenario(cenario):
+    """
+    Executa um único cenário dentro do processo worker, lendo os candles da memória compartilhada.
+    """
+    candles = _CANDLES[cenario["inicio"]:cenario["fim"]]
+
+    if cenario["tipo"] == "bootstrap":
+        rng = np.random.default_rng(cenario["semente"])
+        candles = _reamostrar_blocos(candles, cenario["tamanho_bloco"], rng)
+
+    pnl, drawdown, trades = _rodar_cerebro(candles, cenario["strategy_class"], cenario["comissao"],
+                                           cenario["slippage"], cenario["aquecimento"])
+    return {
+        "tipo": cenario["tipo"],
+        "janela": cenario.get("janela"),
+        "comissao": cenario["comissao"],
+        "slippage": cenario["slippage"],
+        "pnl": pnl,
+        "drawdown": drawdown,
+        "trades": trades,
+    }
+
+
+def gerar_cenarios(n_candles, strategy_class, n_janelas=5, n_bootstrap=100, n_taxas=100,
+                   tamanho_bloco=24, semente=42):
+    """
+    Monta a lista de cenários a serem executados em paralelo:
+    - In-sample / out-of-sample: janelas deslizantes de 2/3 + 1/3 sem sobreposição entre os
+      trechos out-of-sample. A TradingStrategy não tem parâmetros ajustáveis, então nada é
+      treinado: o trecho in-sample é medido após AQUECIMENTO candles, e o out-of-sample roda
+      junto com o in-sample (que só aquece os indicadores) e é medido apenas no próprio trecho.
+    - Bootstrap: séries sintéticas reamostradas em blocos de `tamanho_bloco` candles.
+    - Taxas: série completa com comissão e slippage sorteados em FAIXA_COMISSAO e FAIXA_SLIPPAGE.
+    Cada cenário lê os candles [inicio, fim) e só opera após `aquecimento` candles.
+    """
+    rng = np.random.default_rng(semente)
+    base = {"strategy_class": strategy_class, "comissao": COMISSAO_PADRAO, "slippage": 0.0,
+            "aquecimento": AQUECIMENTO}
+    cenarios = []
+
+    tamanho_teste = n_candles // (n_janelas + 2) if n_janelas else 0
+    tamanho_treino = 2 * tamanho_teste
+    if n_janelas and tamanho_treino <= AQUECIMENTO:
+        raise ValueError(f"Candles insuficientes ({n_candles}) para {n_janelas} janelas in/out-of-sample.")
+
+    for janela in range(n_janelas):
+        inicio = janela * tamanho_teste
+        meio = inicio + tamanho_treino
+        cenarios.append({**base, "tipo": "in_sample", "janela": janela, "inicio": inicio, "fim": meio})
+        cenarios.append({**base, "tipo": "out_of_sample", "janela": janela, "inicio": inicio,
+                         "fim": meio + tamanho_teste, "aquecimento": tamanho_treino})
+
+    if (n_bootstrap or n_taxas) and n_candles <= max(AQUECIMENTO, tamanho_bloco):
+        raise ValueError(f"Candles insuficientes ({n_candles}) para os cenários de bootstrap e taxas.")
+
+    for semente_filha in np.random.SeedSequence(semente).spawn(n_bootstrap):
+        cenarios.append({**base, "tipo": "bootstrap", "inicio": 0, "fim": n_candles,
+                         "tamanho_bloco": tamanho_bloco, "semente": semente_filha})
+
+    for _ in range(n_taxas):
+        cenarios.append({**base, "tipo": "taxas", "inicio": 0, "fim": n_candles,
+                         "comissao": rng.uniform(*FAIXA_COMISSAO), "slippage": rng.uniform(*FAIXA_SLIPPAGE)})
+
+    return cenarios
+
+
+def executar_cenarios(candles, cenarios, processos=None):
+    """
+    Distribui os cenários em um pool de processos que leem os mesmos candles da memória compartilhada.
+    Os workers são criados com "spawn" em todas as plataformas, então cada um apenas importa este
+    módulo (sem conectar à Binance). Retorna um DataFrame com uma linha por cenário.
+
+    Custo: ~2,6 ms por candle por cenário (dominado pelo cálculo de RSI/EMA da TradingStrategy),
+    ou seja, ~90 minutos de CPU para a análise padrão (10000 candles, 210 cenários). Os cenários
+    são independentes; em 1 CPU o pool com 1 processo levou o mesmo tempo que o laço serial.
+    A escalabilidade com mais núcleos ainda não foi medida: use `python robustez.py --escalabilidade`.
+    """
+    processos = processos or os.cpu_count() or 1
+    # Lotes maiores reduzem o overhead de comunicação; 4 lotes por processo equilibram a carga
+    chunksize = max(1, len(cenarios) // (processos * 4))
+
+    shm = shared_memory.SharedMemory(create=True, size=candles.nbytes)
+    try:
+        np.ndarray(candles.shape, dtype=np.float64, buffer=shm.buf)[:] = candles
+
+        with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_iniciar_worker, initargs=(shm.name, candles.shape)) as executor:
+            resultados = list(executor.map(_executar_cenario, cenarios, chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.DataFrame(resultados)
+
+
+def resumir_resultados(resultados):
+    """
+    Calcula a distribuição de PnL, drawdown (%) e número de trades por tipo de cenário.
+    """
+    return resultados.groupby("tipo")[["pnl", "drawdown", "trades"]].describe(percentiles=PERCENTIS)
+
+
+def medir_escalabilidade(candles, cenarios, processos=(1, 2, 4, None)):
+    """
+    Mede o tempo de executar_cenarios para cada quantidade de processos (None = todos os núcleos).
+    Retorna um DataFrame com tempo, speedup e eficiência em relação ao primeiro item.
+    """
+    medicoes = []
+    for quantidade in processos:
+        quantidade = quantidade or os.cpu_count() or 1
+        inicio = time.perf_counter()
+        executar_cenarios(candles, cenarios, quantidade)
+        medicoes.append({"processos": quantidade, "tempo": time.perf_counter() - inicio})
+
+    medicoes = pd.DataFrame(medicoes)
+    base = medicoes.iloc[0]
+    medicoes["speedup"] = base["tempo"] / medicoes["tempo"]
+    medicoes["eficiencia"] = medicoes["speedup"] * base["processos"] / medicoes["processos"]
+
+    for _, linha in medicoes.iterrows():
+        logging.info(f"⏱️ {int(linha['processos'])} processos: {linha['tempo']:.1f}s - "
+                     f"speedup {linha['speedup']:.2f}x - eficiência {linha['eficiencia']:.0%}")
+    return medicoes
+
+
+def obter_historico(limite_total=LIMITE_TOTAL, cripto_atual=CRIPTO_ATUAL):
+    """
+    Obtém `limite_total` candles paginando a API da Binance do mais recente para o mais antigo,
+    já que cada requisição retorna no máximo LIMITE_CANDLES candles.
+    """
+    # Importado aqui para que os workers (e quem só gera cenários) não conectem à Binance
+    from bot import obter_dados_historicos
+
+    partes = []
+    fim = None
+    restante = limite_total
+
+    # Cada página repetiria os logs de "Dados históricos carregados"; erros continuam visíveis
+    logger = logging.getLogger()
+    nivel_anterior = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        while restante > 0:
+            limite = min(LIMITE_CANDLES, restante)
+            df, _ = obter_dados_historicos(limite, cripto_atual, fim=fim)
+            if df is None or df.empty:
+                break  # Histórico esgotado ou falha na requisição: segue com as páginas já obtidas
+
+            partes.append(df)
+            restante -= len(df)
+            if len(df) < limite:
+                break  # Não há mais histórico disponível
+
+            # Próxima página termina 1 ms antes do candle mais antigo já obtido
+            fim = df["tempo"].iloc[0].value // 1_000_000 - 1
+    finally:
+        logger.setLevel(nivel_anterior)
+
+    if not partes:
+        return None
+
+    df = pd.concat(partes[::-1], ignore_index=True)
+    logging.info(f"\n📊 Dados históricos carregados ({cripto_atual}, 5m): {len(df)} candles "
+                 f"de {df['tempo'].iloc[0]} a {df['tempo'].iloc[-1]}")
+    if len(df) < limite_total:
+        logging.warning(f"⚠️ Apenas {len(df)} de {limite_total} candles disponíveis")
+    return df
+
+
+def rodar_robustez(strategy_class, limite_total=LIMITE_TOTAL, n_janelas=5, n_bootstrap=100, n_taxas=100,
+                   tamanho_bloco=24, processos=None, semente=42):
+    """
+    Executa a análise de robustez (in/out-of-sample, bootstrap e taxas) com os dados históricos da Binance.
+    """
+    logging.info("\n🚀 Iniciando análise de robustez...")
+
+    df = obter_historico(limite_total, CRIPTO_ATUAL)
+
+    if df is None:
+        logging.error("❌ Erro ao obter dados históricos. Não será possível rodar a análise de robustez.")
+        return None
+
+    candles = _candles_para_array(preparar_dados_backtrader(df))
+    cenarios = gerar_cenarios(len(candles), strategy_class, n_janelas, n_bootstrap, n_taxas,
+                              tamanho_bloco, semente)
+
+    logging.info(f"📊 {len(cenarios)} cenários em {processos or os.cpu_count()} processos ({len(candles)} candles)")
+
+    resultados = executar_cenarios(candles, cenarios, processos)
+    resumo = resumir_resultados(resultados)
+
+    for tipo, linha in resumo.iterrows():
+        logging.info(f"\n📈 {tipo} ({int(linha[('pnl', 'count')])} execuções)")
+        logging.info("    - PnL ($):      " + " | ".join(
+            f"p{int(p * 100)}: {linha[('pnl', f'{int(p * 100)}%')]:.2f}" for p in PERCENTIS))
+        logging.info("    - Drawdown (%): " + " | ".join(
+            f"p{int(p * 100)}: {linha[('drawdown', f'{int(p * 100)}%')]:.2f}" for p in PERCENTIS))
+        logging.info(f"    - Trades (média): {linha[('trades', 'mean')]:.1f}")
+
+    # Cenários sem nenhum trade não dizem nada sobre robustez
+    sem_trades = resultados[resultados["trades"] == 0].groupby("tipo").size()
+    for tipo, quantidade in sem_trades.items():
+        logging.warning(f"⚠️ {tipo}: {quantidade} execuções sem nenhum trade")
+
+    return resultados
+
+
+if __name__ == "__main__":
+    if "--escalabilidade" in sys.argv:
+        # Mede 1/2/4/N processos com uma carga reduzida (2000 candles, 8 cenários por núcleo)
+        df = obter_historico(2000, CRIPTO_ATUAL)
+        if df is not None:
+            candles = _candles_para_array(preparar_dados_backtrader(df))
+            n_cenarios = 4 * (os.cpu_count() or 1)
+            cenarios = gerar_cenarios(len(candles), TradingStrategy, n_janelas=0, n_bootstrap=n_cenarios,
+                                      n_taxas=n_cenarios)
+            medir_escalabilidade(candles, cenarios)
+    else:
+        # Substitua `TradingStrategy` pela nova estratégia implementada em strategy.py
+        rodar_robustez(TradingStrategy)
@@ -1,5 +1,9 @@
 import pandas as pd
 
+# Parâmetros de gerenciamento de riscos (usados pelo bot e pela análise de robustez)
+STOP_LOSS = 0.05  # 5% de perda máxima permitida
+TAKE_PROFIT = 0.05  # 5% de lucro desejado
+
 class TradingStrategy:
     def __init__(self, df, preco_entrada=None):
         """
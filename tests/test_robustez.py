@@ -0,0 +1,159 @@
+import logging
+import os
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import robustez  # noqa: E402
+from strategies.strategy import TradingStrategy  # noqa: E402
+
+
+def candles_sinteticos(n, semente=0, preco_inicial=30000):
+    rng = np.random.default_rng(semente)
+    fechamento = preco_inicial * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    abertura = np.concatenate(([fechamento[0]], fechamento[:-1])) * (1 + rng.normal(0, 0.0005, n))
+    df = pd.DataFrame({
+        "open": abertura,
+        "high": np.maximum(abertura, fechamento) * (1 + rng.uniform(0, 0.002, n)),
+        "low": np.minimum(abertura, fechamento) * (1 - rng.uniform(0, 0.002, n)),
+        "close": fechamento,
+        "volume": rng.uniform(1, 10, n),
+    }, index=pd.date_range("2024-01-01", periods=n, freq="5min"))
+    return robustez._candles_para_array(df)
+
+
+def test_gerar_cenarios_janelas_dentro_dos_limites():
+    n = 2100
+    cenarios = robustez.gerar_cenarios(n, TradingStrategy, n_janelas=5, n_bootstrap=3, n_taxas=3)
+    in_sample = [c for c in cenarios if c["tipo"] == "in_sample"]
+    out_of_sample = [c for c in cenarios if c["tipo"] == "out_of_sample"]
+
+    assert len(in_sample) == len(out_of_sample) == 5
+    for treino, teste in zip(in_sample, out_of_sample):
+        assert 0 <= treino["inicio"] < treino["fim"] <= n
+        # O out-of-sample roda junto com o in-sample, mas só é medido após ele
+        assert teste["inicio"] == treino["inicio"]
+        assert teste["inicio"] + teste["aquecimento"] == treino["fim"]
+        assert treino["fim"] < teste["fim"] <= n
+
+    trechos_medidos = [(c["inicio"] + c["aquecimento"], c["fim"]) for c in out_of_sample]
+    for (_, fim_anterior), (inicio, _) in zip(trechos_medidos, trechos_medidos[1:]):
+        assert fim_anterior <= inicio
+
+    assert sum(c["tipo"] == "bootstrap" for c in cenarios) == 3
+    assert sum(c["tipo"] == "taxas" for c in cenarios) == 3
+
+
+def test_gerar_cenarios_deterministico():
+    a = robustez.gerar_cenarios(2100, TradingStrategy, n_taxas=5, semente=7)
+    b = robustez.gerar_cenarios(2100, TradingStrategy, n_taxas=5, semente=7)
+    assert [(c["comissao"], c["slippage"]) for c in a] == [(c["comissao"], c["slippage"]) for c in b]
+
+
+def test_reamostrar_blocos_mantem_ohlc_consistente():
+    candles = candles_sinteticos(500)
+    sintetico = robustez._reamostrar_blocos(candles, 24, np.random.default_rng(1))
+    _, abertura, maxima, minima, fechamento, _ = sintetico.T
+
+    assert sintetico.shape == candles.shape
+    np.testing.assert_array_equal(sintetico[:, 0], candles[:, 0])
+    assert np.all(minima <= np.minimum(abertura, fechamento))
+    assert np.all(np.maximum(abertura, fechamento) <= maxima)
+    assert not np.array_equal(sintetico[:, 4], candles[:, 4])
+
+    repetido = robustez._reamostrar_blocos(candles, 24, np.random.default_rng(1))
+    np.testing.assert_array_equal(sintetico, repetido)
+
+
+def test_executar_cenarios_registra_trades():
+    candles = candles_sinteticos(600)
+    cenarios = robustez.gerar_cenarios(len(candles), TradingStrategy, n_janelas=0, n_bootstrap=1, n_taxas=1)
+    resultados = robustez.executar_cenarios(candles, cenarios, processos=1)
+
+    assert list(resultados["tipo"]) == ["bootstrap", "taxas"]
+    assert (resultados["trades"] > 0).all()
+
+
+def test_executar_cenarios_opera_com_preco_atual_do_btc():
+    candles = candles_sinteticos(600, preco_inicial=101000)
+    cenarios = robustez.gerar_cenarios(len(candles), TradingStrategy, n_janelas=0, n_bootstrap=2, n_taxas=0)
+    resultados = robustez.executar_cenarios(candles, cenarios, processos=1)
+
+    assert (resultados["trades"] > 0).all()
+
+
+def test_ordem_rejeitada_nao_bloqueia_novas_ordens(monkeypatch, caplog):
+    # Compras acima do saldo são rejeitadas por margem; a estratégia deve continuar enviando ordens
+    monkeypatch.setattr(robustez, "VALOR_OPERACAO", 10 * robustez.VALOR_INICIAL)
+    candles = candles_sinteticos(600)
+
+    with caplog.at_level(logging.INFO):
+        robustez._rodar_cerebro(candles, TradingStrategy, robustez.COMISSAO_PADRAO, 0.0, robustez.AQUECIMENTO)
+
+    assert sum("Ordem não executada" in mensagem for mensagem in caplog.messages) > 1
+
+
+class SempreCompra:
+    def __init__(self, df, preco_entrada=None):
+        self.df = df
+
+    def verificar_compra(self):
+        return True
+
+    def verificar_venda(self):
+        return False
+
+    def verificar_short(self):
+        return False
+
+    def verificar_recompra(self):
+        return False
+
+
+def test_stop_loss_fecha_posicao():
+    # Queda contínua de 20%: sem stop loss a primeira compra ficaria aberta até o fim
+    n = 400
+    fechamento = np.concatenate((np.full(robustez.AQUECIMENTO, 100000.0), np.linspace(100000, 80000, n)))
+    df = pd.DataFrame({"open": fechamento, "high": fechamento, "low": fechamento, "close": fechamento,
+                       "volume": 1.0}, index=pd.date_range("2024-01-01", periods=len(fechamento), freq="5min"))
+
+    _, _, trades = robustez._rodar_cerebro(robustez._candles_para_array(df), SempreCompra,
+                                           robustez.COMISSAO_PADRAO, 0.0, robustez.AQUECIMENTO)
+
+    assert trades > 1
+
+
+def test_obter_historico_mantem_paginas_quando_historico_acaba(monkeypatch):
+    # Duas páginas completas e depois uma resposta vazia (bot.obter_dados_historicos retorna None)
+    tempos = pd.date_range("2024-01-01", periods=2 * robustez.LIMITE_CANDLES, freq="5min")
+    paginas = [tempos[robustez.LIMITE_CANDLES:], tempos[:robustez.LIMITE_CANDLES]]
+    pedidos = []
+
+    def obter_dados_historicos(limite, cripto_atual, fim=None):
+        pedidos.append(fim)
+        if not paginas:
+            return None, None
+        return pd.DataFrame({"tempo": paginas.pop(0)}), None
+
+    monkeypatch.setitem(sys.modules, "bot", types.SimpleNamespace(obter_dados_historicos=obter_dados_historicos))
+
+    df = robustez.obter_historico(3 * robustez.LIMITE_CANDLES, "BTCUSDT")
+
+    assert list(df["tempo"]) == list(tempos)
+    assert pedidos[0] is None
+    assert pedidos[1] == tempos[robustez.LIMITE_CANDLES].value // 1_000_000 - 1
+
+
+def test_medir_escalabilidade():
+    candles = candles_sinteticos(300)
+    cenarios = robustez.gerar_cenarios(len(candles), TradingStrategy, n_janelas=0, n_bootstrap=2, n_taxas=0)
+
+    medicoes = robustez.medir_escalabilidade(candles, cenarios, processos=(1, 2))
+
+    assert list(medicoes["processos"]) == [1, 2]
+    assert medicoes["speedup"].iloc[0] == 1
+    assert (medicoes["tempo"] > 0).all()